@@ -9,10 +9,14 @@ STATIC_DIR = BASE_DIR
 
 # Import the core analyzer
 from sentiment_analyzer import SentimentAnalyzer  # noqa: E402
+from profiler import install_profiling  # noqa: E402
 
 app = Flask(__name__)
 CORS(app)
 
+# Opt-in profiling endpoints; a no-op unless PROFILE_ADMIN_TOKEN is set
+install_profiling(app)
+
 analyzer = SentimentAnalyzer()
 
 @app.route('/')
@@ -0,0 +1,252 @@
+import os
+import re
+import sys
+import hmac
+import time
+import uuid
+import marshal
+import cProfile
+import pstats
+import threading
+from collections import Counter, OrderedDict
+from flask import request, jsonify, g, Response
+
+# Profiling is only wired into the app when an admin token is configured;
+# without it no hooks, routes or threads are registered, so the hot paths pay nothing.
+ADMIN_TOKEN_HEADER = 'X-Admin-Token'
+MAX_STORED_PROFILES = 20
+DEFAULT_SAMPLE_INTERVAL = 0.01
+# Shorter intervals make the sampler thread hog the GIL and slow the worker
+MIN_SAMPLE_INTERVAL = 0.001
+# Per-request and per-pool threads get numbered names ("Thread-7 (process_request_thread)",
+# "ThreadPoolExecutor-3_0"); strip the numbers so their stacks merge into one root
+THREAD_NUMBER_PATTERN = re.compile(r'-\d+(?:_\d+)?')
+
+
+class SamplingProfiler:
+    """
+    Low-overhead whole-worker profiler: a background thread periodically
+    samples the stack of every other thread and aggregates them as
+    flamegraph-compatible collapsed stacks ("frame;frame;frame count").
+    """
+
+    def __init__(self, interval=DEFAULT_SAMPLE_INTERVAL):
+        self.interval = max(interval, MIN_SAMPLE_INTERVAL)
+        self.samples = 0
+        self.started_at = None
+        self._stacks = Counter()
+        self._lock = threading.Lock()
+        # Separate from _lock: stop() joins the sampler thread, which takes _lock
+        self._control_lock = threading.Lock()
+        self._stop_event = threading.Event()
+        self._thread = None
+
+    @property
+    def running(self):
+        return self._thread is not None and self._thread.is_alive()
+
+    def start(self, interval=None):
+        with self._control_lock:
+            if self.running:
+                return False
+            if interval:
+                self.interval = max(interval, MIN_SAMPLE_INTERVAL)
+            self._stop_event.clear()
+            self.started_at = time.time()
+            self._thread = threading.Thread(target=self._run, name='sampling-profiler', daemon=True)
+            self._thread.start()
+            return True
+
+    def stop(self):
+        with self._control_lock:
+            if not self.running:
+                return False
+            self._stop_event.set()
+            self._thread.join()
+            self._thread = None
+            return True
+
+    def collapsed(self, reset=False):
+        """Return the collected samples in collapsed-stack format"""
+        with self._lock:
+            lines = [f"{stack} {count}" for stack, count in self._stacks.most_common()]
+            if reset:
+                self._stacks.clear()
+                self.samples = 0
+        return '\n'.join(lines) + '\n' if lines else ''
+
+    def _run(self):
+        own_id = threading.get_ident()
+        while not self._stop_event.wait(self.interval):
+            frames = sys._current_frames()
+            names = {thread.ident: THREAD_NUMBER_PATTERN.sub('', thread.name) for thread in threading.enumerate()}
+            with self._lock:
+                for thread_id, frame in frames.items():
+                    if thread_id == own_id:
+                        continue
+                    stack = self._collapse(frame)
+                    self._stacks[f"{names.get(thread_id, 'Thread')};{stack}"] += 1
+                self.samples += 1
+
+    @staticmethod
+    def _collapse(frame):
+        parts = []
+        while frame is not None:
+            code = frame.f_code
+            parts.append(f"{code.co_name} ({os.path.basename(code.co_filename)}:{code.co_firstlineno})")
+            frame = frame.f_back
+        return ';'.join(reversed(parts))
+
+
+class RequestProfiles:
+    """Bounded store of per-request cProfile results as marshalled pstats data"""
+
+    def __init__(self, max_profiles=MAX_STORED_PROFILES):
+        self.max_profiles = max_profiles
+        self._profiles = OrderedDict()
+        self._lock = threading.Lock()
+
+    def add(self, profile_id, path, duration, profile):
+        stats = pstats.Stats(profile)
+        with self._lock:
+            self._profiles[profile_id] = {
+                'path': path,
+                'duration': duration,
+                'created_at': time.time(),
+                'data': marshal.dumps(stats.stats)
+            }
+            while len(self._profiles) > self.max_profiles:
+                self._profiles.popitem(last=False)
+
+    def get(self, profile_id):
+        with self._lock:
+            return self._profiles.get(profile_id)
+
+    def list(self):
+        with self._lock:
+            return [
+                {'id': profile_id, 'path': entry['path'], 'duration': entry['duration'], 'created_at': entry['created_at']}
+                for profile_id, entry in reversed(self._profiles.items())
+            ]
+
+
+def install_profiling(app):
+    """
+    Register per-request profiling hooks and /admin/profile endpoints on app.
+    Does nothing unless PROFILE_ADMIN_TOKEN is set.
+    """
+    admin_token = os.getenv('PROFILE_ADMIN_TOKEN', '')
+    if not admin_token:
+        return None
+
+    try:
+        interval = float(os.getenv('PROFILE_SAMPLE_INTERVAL', str(DEFAULT_SAMPLE_INTERVAL)))
+    except ValueError:
+        interval = 0
+    if interval < MIN_SAMPLE_INTERVAL:
+        print(f"[WARNING] PROFILE_SAMPLE_INTERVAL must be at least {MIN_SAMPLE_INTERVAL}s; using {DEFAULT_SAMPLE_INTERVAL}s")
+        interval = DEFAULT_SAMPLE_INTERVAL
+    sampler = SamplingProfiler(interval=interval)
+    profiles = RequestProfiles()
+    # Only one profiled request runs at a time, so two profiles never overlap. On
+    # Python 3.12+ cProfile hooks the whole process, so a profile still records any
+    # unprofiled requests running concurrently; profile on a quiet worker.
+    profile_lock = threading.Lock()
+
+    def is_admin():
+        supplied = request.headers.get(ADMIN_TOKEN_HEADER, '')
+        return hmac.compare_digest(supplied.encode(), admin_token.encode())
+
+    def wants_profile():
+        flag = request.args.get('profile') or request.headers.get('X-Profile', '')
+        return flag in ('1', 'true') and is_admin()
+
+    @app.before_request
+    def start_request_profile():
+        if not wants_profile():
+            return
+        if not profile_lock.acquire(blocking=False):
+            print(f"[WARNING] Request profiling skipped for {request.path}: another profiled request is running")
+            return
+        profile = cProfile.Profile()
+        try:
+            profile.enable()
+        except ValueError as e:
+            # Another profiling tool (e.g. an outside cProfile) is already active
+            profile_lock.release()
+            print(f"[WARNING] Request profiling skipped: {str(e)}")
+            return
+        g.request_profile = (uuid.uuid4().hex[:12], profile, time.perf_counter())
+
+    @app.after_request
+    def add_profile_header(response):
+        active = g.get('request_profile')
+        if active is not None:
+            response.headers['X-Profile-Id'] = active[0]
+        return response
+
+    @app.teardown_request
+    def finish_request_profile(exc):
+        # teardown_request also runs when an exception skips after_request,
+        # so the profiler can never stay enabled on this worker thread
+        active = g.pop('request_profile', None)
+        if active is None:
+            return
+        profile_id, profile, started = active
+        try:
+            profile.disable()
+            profiles.add(profile_id, request.path, time.perf_counter() - started, profile)
+        finally:
+            profile_lock.release()
+
+    @app.route('/admin/profile/requests', methods=['GET'])
+    def list_request_profiles():
+        if not is_admin():
+            return jsonify({'error': 'Invalid admin token'}), 403
+        return jsonify({'profiles': profiles.list()})
+
+    @app.route('/admin/profile/requests/<profile_id>', methods=['GET'])
+    def get_request_profile(profile_id):
+        if not is_admin():
+            return jsonify({'error': 'Invalid admin token'}), 403
+        entry = profiles.get(profile_id)
+        if entry is None:
+            return jsonify({'error': 'Profile not found'}), 404
+        # Load with pstats.Stats('<id>.prof') or open in snakeviz
+        return Response(
+            entry['data'],
+            mimetype='application/octet-stream',
+            headers={'Content-Disposition': f'attachment; filename={profile_id}.prof'}
+        )
+
+    @app.route('/admin/profile/sampler', methods=['GET'])
+    def get_sampler_profile():
+        if not is_admin():
+            return jsonify({'error': 'Invalid admin token'}), 403
+        collapsed = sampler.collapsed(reset=request.args.get('reset') in ('1', 'true'))
+        return Response(collapsed, mimetype='text/plain')
+
+    @app.route('/admin/profile/sampler/<action>', methods=['POST'])
+    def control_sampler(action):
+        if not is_admin():
+            return jsonify({'error': 'Invalid admin token'}), 403
+        if action == 'start':
+            interval = (request.get_json(silent=True) or {}).get('interval')
+            if interval is not None and (not isinstance(interval, (int, float)) or interval < MIN_SAMPLE_INTERVAL):
+                return jsonify({'error': f'Invalid interval parameter. Must be a number of at least {MIN_SAMPLE_INTERVAL} seconds.'}), 400
+            sampler.start(interval)
+        elif action == 'stop':
+            sampler.stop()
+        else:
+            return jsonify({'error': f'Unknown sampler action: {action}'}), 404
+        return jsonify({
+            'running': sampler.running,
+            'interval': sampler.interval,
+            'samples': sampler.samples,
+            'started_at': sampler.started_at
+        })
+
+    if os.getenv('PROFILE_SAMPLER', '').lower() in ('1', 'true'):
+        sampler.start()
+
+    return sampler
@@ -1,6 +1,14 @@
 import os
-from datetime import datetime, timedelta
+import itertools
+import threading
+import time
+from collections import OrderedDict
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime, timedelta, timezone
+from email.utils import parsedate_to_datetime
 from pathlib import Path
+from urllib.parse import quote_plus, urlparse
+import xml.etree.ElementTree as ET
 import pandas as pd
 from textblob import TextBlob
 from dotenv import load_dotenv
@@ -11,7 +19,7 @@ import ssl
 import subprocess
 import json
 import requests
-from bs4 import BeautifulSoup
+from bs4 import BeautifulSoup, SoupStrainer
 
 # Create a directory for NLTK data if it doesn't exist
 nltk_data_dir = Path(os.path.expanduser('~/nltk_data'))
@@ -101,6 +109,234 @@ class RateLimit:
         self._check_reset()
         return max(0, self.MAX_MONTHLY_WRITES - self.monthly_writes)
 
+# Default scrape sources; "{query}" is replaced with the URL-encoded brand name
+DEFAULT_SCRAPE_URLS = [
+    'https://news.google.com/rss/search?q={query}&hl=en-US&gl=US&ceid=US:en',
+    'https://www.bing.com/news/search?q={query}&format=rss',
+]
+
+
+def _parse_published(value):
+    """Parse an RSS (RFC 822) or Atom/HTML (ISO 8601) date into a naive UTC datetime."""
+    if not value:
+        return datetime.now()
+    try:
+        parsed = parsedate_to_datetime(value)
+    except (TypeError, ValueError):
+        try:
+            parsed = datetime.fromisoformat(value.replace('Z', '+00:00'))
+        except ValueError:
+            return datetime.now()
+    if parsed.tzinfo is not None:
+        parsed = parsed.astimezone(timezone.utc).replace(tzinfo=None)
+    return parsed
+
+
+class WebScraper:
+    """
+    Fetch brand mentions from RSS/Atom feeds and HTML pages.
+    Pages are fetched concurrently with per-host politeness limits and
+    revalidated with ETag/Last-Modified so unchanged pages are not re-downloaded.
+    """
+
+    USER_AGENT = 'BrandEcho/1.0 (+https://github.com/Vivekkumar-12/BrandEcho)'
+
+    def __init__(self, urls=None, timeout=10, max_workers=4, per_host_limit=1,
+                 min_host_interval=0.5, max_items_per_page=25, max_cached_pages=200,
+                 max_bytes=1024 * 1024):
+        self.urls = list(urls) if urls else list(DEFAULT_SCRAPE_URLS)
+        self.timeout = timeout
+        self.max_workers = max(1, max_workers)
+        self.per_host_limit = max(1, per_host_limit)
+        self.min_host_interval = max(0.0, min_host_interval)
+        self.max_items_per_page = max_items_per_page
+        self.max_cached_pages = max(0, max_cached_pages)
+        self.max_bytes = max_bytes
+        self._host_slots = {}
+        self._host_next_fetch = {}
+        self._host_lock = threading.Lock()
+        # LRU of url -> {'etag', 'last_modified', 'items'} for conditional requests;
+        # bounded because URLs embed the caller-supplied brand name
+        self._cache = OrderedDict()
+        self._cache_lock = threading.Lock()
+
+    def fetch(self, brand_name, days):
+        """Return mentions of brand_name from the configured URLs within the last `days` days"""
+        query = quote_plus(brand_name)
+        urls = [template.replace('{query}', query) for template in self.urls]
+        if not urls:
+            return []
+
+        with ThreadPoolExecutor(max_workers=min(self.max_workers, len(urls))) as pool:
+            pages = list(pool.map(self._fetch_page, urls))
+
+        cutoff = datetime.now() - timedelta(days=days)
+        needle = brand_name.lower()
+        posts = []
+        seen = set()
+        for items in pages:
+            for item in items:
+                key = item['text'].lower()
+                if needle not in key or item['created_at'] < cutoff or key in seen:
+                    continue
+                seen.add(key)
+                posts.append(dict(item))
+        return posts
+
+    def _acquire_host(self, host):
+        """Wait for a free slot on host and for its minimum request interval to pass"""
+        with self._host_lock:
+            slot = self._host_slots.get(host)
+            if slot is None:
+                slot = self._host_slots[host] = threading.BoundedSemaphore(self.per_host_limit)
+        slot.acquire()
+        with self._host_lock:
+            now = time.monotonic()
+            start = max(now, self._host_next_fetch.get(host, now))
+            self._host_next_fetch[host] = start + self.min_host_interval
+        if start > now:
+            time.sleep(start - now)
+        return slot
+
+    def _fetch_page(self, url):
+        with self._cache_lock:
+            cached = self._cache.get(url)
+            if cached:
+                self._cache.move_to_end(url)
+
+        headers = {'User-Agent': self.USER_AGENT}
+        if cached:
+            if cached['etag']:
+                headers['If-None-Match'] = cached['etag']
+            if cached['last_modified']:
+                headers['If-Modified-Since'] = cached['last_modified']
+
+        host = urlparse(url).netloc
+        slot = self._acquire_host(host)
+        try:
+            with requests.get(url, headers=headers, timeout=self.timeout, stream=True) as response:
+                if response.status_code == 304 and cached:
+                    return cached['items']
+                if response.status_code != 200:
+                    print(f"Web scrape of {url} returned {response.status_code}")
+                    return []
+                items = self._parse_response(response, host)
+                etag = response.headers.get('ETag')
+                last_modified = response.headers.get('Last-Modified')
+        except Exception as e:
+            print(f"Error scraping {url}: {str(e)}")
+            return []
+        finally:
+            slot.release()
+
+        with self._cache_lock:
+            if (etag or last_modified) and self.max_cached_pages:
+                self._cache[url] = {'etag': etag, 'last_modified': last_modified, 'items': items}
+                self._cache.move_to_end(url)
+                while len(self._cache) > self.max_cached_pages:
+                    self._cache.popitem(last=False)
+            else:
+                # Drop validators that no longer describe the page we just downloaded
+                self._cache.pop(url, None)
+        return items
+
+    def _parse_response(self, response, host):
+        """Sniff the first chunk and dispatch to the feed or HTML parser"""
+        chunks = self._read_capped(response)
+        first = next(chunks, b'')
+        head = first[:1024].lower()
+        content_type = response.headers.get('Content-Type', '').lower()
+        is_feed = (b'<rss' in head or b'<feed' in head or b'<rdf' in head
+                   or ('xml' in content_type and 'html' not in content_type))
+        if is_feed:
+            return self._parse_feed(itertools.chain([first], chunks), host)
+        return self._parse_html(first + b''.join(chunks), host)
+
+    def _read_capped(self, response):
+        """Yield body chunks until max_bytes have been read, then close the response"""
+        received = 0
+        for chunk in response.iter_content(chunk_size=16384):
+            remaining = self.max_bytes - received
+            if len(chunk) > remaining:
+                yield chunk[:remaining]
+                print(f"Web scrape of {response.url} truncated at {self.max_bytes} bytes")
+                response.close()
+                return
+            received += len(chunk)
+            yield chunk
+
+    def _parse_feed(self, chunks, host):
+        """Incrementally parse RSS/Atom, keeping only <item>/<entry> nodes"""
+        parser = ET.XMLPullParser(events=('end',))
+        items = []
+        try:
+            for chunk in chunks:
+                parser.feed(chunk)
+                for _, elem in parser.read_events():
+                    if elem.tag.rsplit('}', 1)[-1] not in ('item', 'entry'):
+                        continue
+                    item = self._feed_item(elem, host)
+                    elem.clear()
+                    if item:
+                        items.append(item)
+                    if len(items) >= self.max_items_per_page:
+                        return items
+            parser.close()
+        except ET.ParseError as e:
+            print(f"Error parsing feed from {host}: {str(e)}")
+        return items
+
+    def _feed_item(self, elem, host):
+        fields = {}
+        for child in elem:
+            tag = child.tag.rsplit('}', 1)[-1]
+            if tag not in fields:
+                fields[tag] = (child.text or '').strip()
+
+        description = fields.get('description') or fields.get('summary') or ''
+        if '<' in description:
+            description = BeautifulSoup(description, 'html.parser').get_text(' ', strip=True)
+        text = f"{fields.get('title', '')} {description}".strip()
+        if not text:
+            return None
+
+        published = (fields.get('pubDate') or fields.get('published')
+                     or fields.get('updated') or fields.get('date'))
+        return {
+            'text': text,
+            'created_at': _parse_published(published),
+            'user': fields.get('source') or host,
+            'type': 'news',
+            'score': 1,
+            'source': 'Web Scrape'
+        }
+
+    def _parse_html(self, markup, host):
+        """Parse only <article> nodes of an HTML page instead of the whole document"""
+        soup = BeautifulSoup(markup, 'html.parser', parse_only=SoupStrainer('article'))
+        items = []
+        for article in soup.find_all('article', limit=self.max_items_per_page):
+            heading = article.find(['h1', 'h2', 'h3'])
+            paragraph = article.find('p')
+            title = heading.get_text(' ', strip=True) if heading else ''
+            summary = paragraph.get_text(' ', strip=True) if paragraph else ''
+            text = f"{title} {summary}".strip()
+            if not text:
+                continue
+
+            time_tag = article.find('time')
+            published = (time_tag.get('datetime') or time_tag.get_text(strip=True)) if time_tag else None
+            items.append({
+                'text': text,
+                'created_at': _parse_published(published),
+                'user': host,
+                'type': 'news',
+                'score': 1,
+                'source': 'Web Scrape'
+            })
+        return items
+
+
 class SentimentAnalyzer:
     def __init__(self):
         try:
@@ -124,6 +360,15 @@ class SentimentAnalyzer:
         self.newsapi_key = os.getenv('NEWSAPI_KEY', '')  # Get from https://newsapi.org (free tier available)
         self.free_sources = ['newsapi', 'web_scrape']  # Fallback to web scraping if no API key
         self.request_timeout = float(os.getenv('HTTP_REQUEST_TIMEOUT', '10'))
+        # Comma-separated feed/search URLs; "{query}" is replaced with the brand name
+        scrape_urls = [url.strip() for url in os.getenv('SCRAPE_URLS', '').split(',') if url.strip()]
+        self.web_scraper = WebScraper(
+            urls=scrape_urls,
+            timeout=self.request_timeout,
+            max_workers=int(os.getenv('SCRAPE_MAX_WORKERS', '4')),
+            per_host_limit=int(os.getenv('SCRAPE_PER_HOST_LIMIT', '1')),
+            min_host_interval=float(os.getenv('SCRAPE_MIN_HOST_INTERVAL', '0.5'))
+        )
 
     def analyze_text(self, text, increment_usage=True):
         """
@@ -392,10 +637,12 @@ class SentimentAnalyzer:
         return []
     
     def _fetch_from_web_scrape(self, brand_name, days):
-        """Free fallback: Return curated mentions (can be extended with web scraping libraries like selenium)"""
-        # This is a free alternative that doesn't require API keys
-        # You can enhance this by adding web scraping with BeautifulSoup or Selenium
-        return self._get_sample_mentions(brand_name)
+        """Free fallback: scrape the configured RSS/Atom feeds and HTML pages (no API key required)"""
+        try:
+            return self.web_scraper.fetch(brand_name, days)
+        except Exception as e:
+            print(f"Error fetching from web scrape: {str(e)}")
+        return []
     
     def _get_sample_mentions(self, brand_name):
         """Return sample data for demonstration when no API is available"""
@@ -1,10 +1,14 @@
 from flask import Flask, request, jsonify, send_from_directory
 from sentiment_analyzer import SentimentAnalyzer
 from flask_cors import CORS
+from profiler import install_profiling
 
 app = Flask(__name__)
 CORS(app)
 
+# Opt-in profiling endpoints; a no-op unless PROFILE_ADMIN_TOKEN is set
+install_profiling(app)
+
 # Initialize the sentiment analyzer
 try:
     analyzer = SentimentAnalyzer()